@@ -6,12 +6,18 @@ Process Intelligence Graph Builder (Celonis-Style)
 
 Transforms event logs into a process-centric graph visualization
 following Celonis object-centric process mining principles.
+
+Usage:
+    python build_graph.py                              Today's trace
+    python build_graph.py --from 2026-01-01 --to 2026-03-31
+
+Closed days are read from the columnar store (event_store.py compact)
+when present; today and days not yet compacted come from the JSONL.
 """
 
+import argparse
 import json
 import os
-import re
-import unicodedata
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
@@ -19,6 +25,8 @@ from collections import defaultdict
 import networkx as nx
 from pyvis.network import Network
 
+from text_normalization import normalize_text, parse_monto, remove_accents
+
 # Get project root (parent of scripts directory)
 PROJECT_ROOT = Path(__file__).parent.parent
 TRACES_DIR = PROJECT_ROOT / "knowledge_base" / "traces"
@@ -58,52 +66,9 @@ EVENT_TO_STATE = {
 }
 
 # =============================================================================
-# NORMALIZATION FUNCTIONS
+# CASE / STATE RESOLUTION
 # =============================================================================
 
-def normalize_text(text: str) -> str:
-    """
-    Normalize text: Title Case, remove accents for comparison,
-    but preserve readable format.
-    """
-    if not text:
-        return ""
-
-    # Strip and title case
-    normalized = text.strip().title()
-
-    # Common corrections
-    corrections = {
-        "Patricia": "Patricia",
-        "Angelica": "Angelica",
-        "Angélica": "Angelica",
-        "Tyc": "TYC",
-        "Tic": "TYC",
-        "T&C": "TYC",
-        "Dhl": "DHL",
-        "Hugo": "Hugo",
-        "Johana": "Johana",
-        "Viniles": "Viniles",
-        "Vinilas": "Viniles",
-        "Polos": "Polos",
-    }
-
-    for wrong, correct in corrections.items():
-        if normalized == wrong:
-            normalized = correct
-            break
-
-    return normalized
-
-
-def remove_accents(text: str) -> str:
-    """Remove accents for ID generation (keeps letters)."""
-    if not text:
-        return ""
-    nfkd = unicodedata.normalize('NFKD', text)
-    return ''.join(c for c in nfkd if not unicodedata.combining(c))
-
-
 def generate_case_id(event: dict) -> str:
     """
     Generate a Case ID for an event.
@@ -124,9 +89,9 @@ def generate_case_id(event: dict) -> str:
     provider = None
 
     for art in artifacts:
-        if art.startswith("cliente:"):
+        if art.lower().startswith("cliente:"):
             client = art.split(":", 1)[1]
-        elif art.startswith("proveedor:"):
+        elif art.lower().startswith("proveedor:"):
             provider = art.split(":", 1)[1]
 
     if client and provider:
@@ -183,16 +148,10 @@ def get_today_date():
     return datetime.now().strftime("%Y-%m-%d")
 
 
-def load_today_events():
-    """Load events from today's JSONL trace file."""
-    today_file = TRACES_DIR / f"{get_today_date()}.jsonl"
-
-    if not today_file.exists():
-        print(f"No trace file found for today: {today_file}")
-        return []
-
+def load_trace_file(trace_file: Path):
+    """Load events from one JSONL trace file."""
     events = []
-    with open(today_file, "r", encoding="utf-8") as f:
+    with open(trace_file, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if line:
@@ -205,6 +164,92 @@ def load_today_events():
     return events
 
 
+def load_today_events():
+    """Load events from today's JSONL trace file."""
+    today_file = TRACES_DIR / f"{get_today_date()}.jsonl"
+
+    if not today_file.exists():
+        print(f"No trace file found for today: {today_file}")
+        return []
+
+    return load_trace_file(today_file)
+
+
+def load_store_events(start_date: str, end_date: str):
+    """
+    Load closed days in [start_date, end_date] from the columnar store.
+    Rebuilds the event dicts build_process_graph() expects from the
+    pre-parsed columns. Returns (events, stored_days).
+    """
+    try:
+        import numpy as np
+        import event_store
+    except ImportError:
+        print("numpy not installed, reading JSONL traces only")
+        return [], set()
+
+    manifest = event_store.read_manifest()
+    stored_days = {day for day in manifest["days"] if start_date <= day <= end_date}
+    if not stored_days:
+        return [], stored_days
+
+    columns = event_store.load_columns(
+        ["timestamp", "case_id", "actor", "action", "tipo", "pedido_id",
+         "nuevo_estado", "cliente", "proveedor", "producto", "monto"],
+        start_date,
+        end_date,
+    )
+    decoded = {
+        name: event_store.decode_column(name, codes)
+        for name, codes in columns.items()
+        if name in event_store.DICT_COLUMNS
+    }
+    timestamps = np.datetime_as_string(columns["timestamp"], unit="ms")
+
+    events = []
+    for i in range(len(timestamps)):
+        context = {}
+        for key, name in (("tipo", "tipo"), ("pedidoId", "pedido_id"), ("nuevoEstado", "nuevo_estado")):
+            if decoded[name][i] is not None:
+                context[key] = decoded[name][i]
+
+        artifacts = [
+            f"{name}:{decoded[name][i]}"
+            for name in ("cliente", "proveedor", "producto")
+            if decoded[name][i] is not None
+        ]
+        if not np.isnan(columns["monto"][i]):
+            artifacts.append(f"monto:{columns['monto'][i]}")
+
+        event = {
+            "timestamp": "" if timestamps[i] == "NaT" else f"{timestamps[i]}Z",
+            "actor": decoded["actor"][i] or "Unknown",
+            "action": decoded["action"][i] or "",
+            "context": context,
+            "artifacts": artifacts,
+        }
+        if decoded["case_id"][i] is not None:
+            event["caseId"] = decoded["case_id"][i]
+        events.append(event)
+
+    return events, stored_days
+
+
+def load_events(start_date: str, end_date: str):
+    """
+    Load events for [start_date, end_date]: closed days from the columnar
+    store, everything else (today, days not yet compacted) from JSONL.
+    """
+    events, stored_days = load_store_events(start_date, end_date)
+
+    for trace_file in sorted(TRACES_DIR.glob("*.jsonl")):
+        day = trace_file.stem
+        if start_date <= day <= end_date and day not in stored_days:
+            events.extend(load_trace_file(trace_file))
+
+    return events
+
+
 # =============================================================================
 # GRAPH BUILDING (Celonis Process Intelligence Style)
 # =============================================================================
@@ -298,16 +343,15 @@ def build_process_graph(events):
         for artifact in event.get("artifacts", []):
             if ":" in artifact:
                 art_type, art_value = artifact.split(":", 1)
+                art_type = art_type.strip().lower()
                 art_value_norm = normalize_text(art_value)
                 case_info["artifacts"].add(f"{art_type}:{art_value_norm}")
 
                 # Track amounts
                 if art_type == "monto":
-                    try:
-                        amount = float(re.sub(r'[^\d.]', '', art_value))
+                    amount = parse_monto(art_value)
+                    if amount is not None:
                         case_info["total_amount"] += amount
-                    except:
-                        pass
 
     # ==========================================================================
     # STEP 3: Add Case Nodes and Connect to States
@@ -552,19 +596,36 @@ def generate_html(G, output_path):
     print(f"Graph saved to: {output_path}")
 
 
-def main():
+def parse_args(argv=None):
+    """Parse the optional date range (YYYY-MM-DD, inclusive)."""
+    parser = argparse.ArgumentParser(description="Build the process intelligence graph")
+    parser.add_argument("--from", dest="start_date", help="First day (default: today)")
+    parser.add_argument("--to", dest="end_date", help="Last day (default: --from or today)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main entry point."""
+    args = parse_args(argv)
+    today = get_today_date()
+    start_date = args.start_date or today
+    end_date = args.end_date or args.start_date or today
+    is_today = start_date == end_date == today
+
     print("=" * 60)
     print("CREAACTIVO - Process Intelligence Graph Builder")
     print("Celonis-Style Process Mining Visualization")
     print("=" * 60)
-    print(f"\nBuilding graph for {get_today_date()}...")
+    if start_date == end_date:
+        print(f"\nBuilding graph for {start_date}...")
+    else:
+        print(f"\nBuilding graph for {start_date} .. {end_date}...")
 
     # Ensure output directory exists
     GRAPHS_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Load today's events
-    events = load_today_events()
+    # Load events (today only: JSONL; ranges: columnar store + JSONL)
+    events = load_today_events() if is_today else load_events(start_date, end_date)
     print(f"Loaded {len(events)} events")
 
     if not events:
@@ -597,12 +658,19 @@ def main():
         print(f"Built graph with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges")
 
     # Generate HTML
-    output_path = GRAPHS_DIR / "graph_today.html"
-    generate_html(G, output_path)
-
-    # Also save with date for history
-    dated_path = GRAPHS_DIR / f"graph_{get_today_date()}.html"
-    generate_html(G, dated_path)
+    if is_today:
+        output_path = GRAPHS_DIR / "graph_today.html"
+        generate_html(G, output_path)
+
+        # Also save with date for history
+        dated_path = GRAPHS_DIR / f"graph_{today}.html"
+        generate_html(G, dated_path)
+    elif start_date == end_date:
+        output_path = GRAPHS_DIR / f"graph_{start_date}.html"
+        generate_html(G, output_path)
+    else:
+        output_path = GRAPHS_DIR / f"graph_{start_date}_{end_date}.html"
+        generate_html(G, output_path)
 
     print("\n" + "=" * 60)
     print("Done! Graph features:")
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CREAACTIVO LOGISTICS INTELLIGENCE SYSTEM
+Columnar Event-Log Store
+
+Compacts closed-day JSONL traces (knowledge_base/traces/YYYY-MM-DD.jsonl)
+into an append-only columnar store so multi-month analysis doesn't have to
+re-parse JSON and re-split artifact strings like "monto:S/.150" every run.
+
+Layout (knowledge_base/columnar/):
+    manifest.json        Row count, per-day row ranges, column dtypes
+    <column>.bin         Raw little-endian values, one file per column
+    dict_<column>.json   Append-only dictionary for string columns
+
+String columns (actor, action, cliente, proveedor, ...) are dictionary
+encoded as int32 codes (-1 = missing). Dictionaries only grow, so codes
+stay valid across appends. Entity names go through the same
+normalize_text() as build_graph.py first, so "Tyc" and "T&C" share a
+code. Artifacts are pre-parsed into typed columns: amounts (monto,
+costo_total, precio_total, precio_unitario, adelanto) as float64 in soles,
+NaN when absent, and cantidad as int32. Loads are np.memmap views: only the
+requested columns are touched and a contiguous date range is zero-copy.
+
+Usage:
+    python event_store.py compact    Append closed days not yet stored
+    python event_store.py info       Show stored days and row count
+"""
+
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from text_normalization import normalize_text, parse_monto
+
+# Get project root (parent of scripts directory)
+PROJECT_ROOT = Path(__file__).parent.parent
+TRACES_DIR = PROJECT_ROOT / "knowledge_base" / "traces"
+STORE_DIR = PROJECT_ROOT / "knowledge_base" / "columnar"
+MANIFEST_FILE = "manifest.json"
+STORE_VERSION = 3
+
+# =============================================================================
+# SCHEMA
+# =============================================================================
+
+# Dictionary-encoded string columns
+DICT_COLUMNS = [
+    "case_id",
+    "actor",
+    "action",
+    "process_state",
+    "tipo",
+    "pedido_id",
+    "nuevo_estado",
+    "cliente",
+    "proveedor",
+    "producto",
+    "origen",
+    "destino",
+]
+
+COLUMN_DTYPES = {
+    "timestamp": "<M8[ms]",
+    **{name: "<i4" for name in DICT_COLUMNS},
+    "monto": "<f8",
+    "costo_total": "<f8",
+    "precio_total": "<f8",
+    "precio_unitario": "<f8",
+    "adelanto": "<f8",
+    "cantidad": "<i4",
+}
+
+MISSING_CODE = -1
+MISSING_CANTIDAD = -1
+
+# Artifact keys stored as their own dictionary-encoded column
+ARTIFACT_COLUMNS = {"cliente", "proveedor", "producto", "origen", "destino"}
+
+# Amount artifact keys (lowercased) -> float64 column; any other key
+# containing "costo" goes to costo_total
+AMOUNT_COLUMNS = {
+    "monto": "monto",
+    "preciototal": "precio_total",
+    "preciounitario": "precio_unitario",
+    "adelanto": "adelanto",
+}
+
+# All float64 amount columns
+FLOAT_COLUMNS = [*AMOUNT_COLUMNS.values(), "costo_total"]
+
+# Entity columns normalized like build_graph.py before encoding
+NORMALIZED_COLUMNS = {"actor"} | ARTIFACT_COLUMNS
+
+
+# =============================================================================
+# PARSING
+# =============================================================================
+
+def parse_timestamp(value: str) -> np.datetime64:
+    """Parse an ISO timestamp (as written by the event logger) to UTC ms."""
+    if not value:
+        return np.datetime64("NaT", "ms")
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return np.datetime64("NaT", "ms")
+    if parsed.tzinfo is not None:
+        return np.datetime64(int(parsed.timestamp() * 1000), "ms")
+    return np.datetime64(parsed, "ms")
+
+
+def flatten_event(event: dict) -> dict:
+    """
+    Turn one JSONL event into a flat row of typed values.
+    Artifact strings ("clave:valor") are split once here. Each amount
+    key (Monto, Costo*, PrecioTotal, ...) has its own column and they
+    are never added together; as in the event logger, the last value
+    for a key wins.
+    """
+    context = event.get("context") or {}
+
+    row = {
+        "timestamp": parse_timestamp(event.get("timestamp", "")),
+        "case_id": event.get("caseId"),
+        "actor": event.get("actor") or event.get("resource"),
+        "action": event.get("action") or event.get("activity"),
+        "process_state": event.get("processState"),
+        "tipo": context.get("tipo"),
+        "pedido_id": context.get("pedidoId"),
+        "nuevo_estado": context.get("nuevoEstado"),
+        **{name: np.nan for name in FLOAT_COLUMNS},
+        "cantidad": MISSING_CANTIDAD,
+    }
+
+    for artifact in event.get("artifacts") or []:
+        if not isinstance(artifact, str) or ":" not in artifact:
+            continue
+        key, value = artifact.split(":", 1)
+        key = key.strip().lower()
+        value = value.strip()
+
+        if key in ARTIFACT_COLUMNS:
+            row[key] = value
+        elif key in AMOUNT_COLUMNS or "costo" in key:
+            amount = parse_monto(value)
+            if amount is not None:
+                row[AMOUNT_COLUMNS.get(key, "costo_total")] = amount
+        elif key == "cantidad":
+            digits = re.search(r"\d+", value)
+            if digits:
+                row["cantidad"] = int(digits.group(0))
+
+    return row
+
+
+def read_trace_file(path: Path) -> list:
+    """Read a JSONL trace file, skipping lines that don't parse."""
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    print(f"Error parsing line in {path.name}: {e}")
+                    continue
+    return events
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+def _empty_manifest() -> dict:
+    return {
+        "version": STORE_VERSION,
+        "rows": 0,
+        "days": {},
+        "columns": dict(COLUMN_DTYPES),
+    }
+
+
+def read_manifest(store_dir: Path = STORE_DIR) -> dict:
+    """Read the store manifest (an empty one if the store doesn't exist)."""
+    manifest_path = store_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        return _empty_manifest()
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != STORE_VERSION:
+        raise ValueError(
+            f"Store version {manifest.get('version')} != {STORE_VERSION}: "
+            f"delete {store_dir} and run 'compact' again"
+        )
+    return manifest
+
+
+def read_dictionary(name: str, store_dir: Path = STORE_DIR) -> list:
+    """Read the dictionary (code -> string) of a string column."""
+    path = store_dir / f"dict_{name}.json"
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, data):
+    """Write JSON via a temp file so readers never see a half-written file."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(path)
+
+
+def append_day(day: str, events: list, store_dir: Path = STORE_DIR) -> int:
+    """
+    Append one closed day's events to the store. Returns rows written.
+
+    Column files are appended first, dictionaries next and the manifest
+    last: the manifest row count is the commit point, so bytes left over
+    from an interrupted append are truncated on the next one.
+    """
+    store_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(store_dir)
+
+    if day in manifest["days"]:
+        raise ValueError(f"Day already stored: {day}")
+
+    rows = [flatten_event(event) for event in events]
+    start = manifest["rows"]
+
+    # Dictionary-encode string columns (new values appended, codes stable)
+    dictionaries = {}
+    encoded = {}
+    for name in DICT_COLUMNS:
+        values = read_dictionary(name, store_dir)
+        index = {value: code for code, value in enumerate(values)}
+        codes = np.empty(len(rows), dtype=COLUMN_DTYPES[name])
+        for i, row in enumerate(rows):
+            value = row.get(name)
+            if value is None or value == "":
+                codes[i] = MISSING_CODE
+                continue
+            value = str(value)
+            if name in NORMALIZED_COLUMNS:
+                value = normalize_text(value)
+            if value not in index:
+                index[value] = len(values)
+                values.append(value)
+            codes[i] = index[value]
+        dictionaries[name] = values
+        encoded[name] = codes
+
+    encoded["timestamp"] = np.array([row["timestamp"] for row in rows], dtype=COLUMN_DTYPES["timestamp"])
+    for name in FLOAT_COLUMNS:
+        encoded[name] = np.array([row[name] for row in rows], dtype=COLUMN_DTYPES[name])
+    encoded["cantidad"] = np.array([row["cantidad"] for row in rows], dtype=COLUMN_DTYPES["cantidad"])
+
+    for name, dtype in COLUMN_DTYPES.items():
+        path = store_dir / f"{name}.bin"
+        committed_bytes = start * np.dtype(dtype).itemsize
+        with open(path, "ab") as f:
+            f.truncate(committed_bytes)
+            f.write(encoded[name].tobytes())
+
+    for name, values in dictionaries.items():
+        _write_json(store_dir / f"dict_{name}.json", values)
+
+    manifest["rows"] = start + len(rows)
+    manifest["days"][day] = [start, start + len(rows)]
+    _write_json(store_dir / MANIFEST_FILE, manifest)
+
+    return len(rows)
+
+
+def compact_closed_days(traces_dir: Path = TRACES_DIR, store_dir: Path = STORE_DIR) -> list:
+    """
+    Append every closed day (before today) not yet in the store.
+    Today's trace is still being written by the bot, so it is skipped.
+    """
+    if not traces_dir.exists():
+        print(f"No traces directory: {traces_dir}")
+        return []
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    stored = read_manifest(store_dir)["days"]
+    compacted = []
+
+    for trace_file in sorted(traces_dir.glob("*.jsonl")):
+        day = trace_file.stem
+        if day >= today or day in stored:
+            continue
+        rows = append_day(day, read_trace_file(trace_file), store_dir)
+        print(f"  {day}: {rows} events")
+        compacted.append(day)
+
+    return compacted
+
+
+# =============================================================================
+# LOADING
+# =============================================================================
+
+def _row_ranges(manifest: dict, start_date: str = None, end_date: str = None) -> list:
+    """Row ranges of the stored days within [start_date, end_date]."""
+    ranges = []
+    for day, (start, stop) in sorted(manifest["days"].items(), key=lambda item: item[1][0]):
+        if start_date and day < start_date:
+            continue
+        if end_date and day > end_date:
+            continue
+        if stop > start:
+            ranges.append((start, stop))
+    return ranges
+
+
+def load_columns(columns=None, start_date: str = None, end_date: str = None,
+                 store_dir: Path = STORE_DIR) -> dict:
+    """
+    Load columns as read-only memory-mapped arrays.
+
+    Only the requested columns are opened. When the selected days occupy
+    one contiguous row range (the normal case, days are compacted in
+    order) the result is a zero-copy view; otherwise the pieces are
+    concatenated. String columns come back as int32 codes: decode them
+    with read_dictionary() or decode_column().
+    """
+    manifest = read_manifest(store_dir)
+    names = list(columns) if columns else list(manifest["columns"])
+
+    unknown = [name for name in names if name not in manifest["columns"]]
+    if unknown:
+        raise KeyError(f"Unknown columns: {', '.join(unknown)}")
+
+    ranges = _row_ranges(manifest, start_date, end_date)
+    contiguous = all(prev[1] == cur[0] for prev, cur in zip(ranges, ranges[1:]))
+
+    result = {}
+    for name in names:
+        dtype = np.dtype(manifest["columns"][name])
+        if not ranges:
+            result[name] = np.empty(0, dtype=dtype)
+            continue
+
+        data = np.memmap(store_dir / f"{name}.bin", dtype=dtype, mode="r", shape=(manifest["rows"],))
+        if contiguous:
+            result[name] = data[ranges[0][0]:ranges[-1][1]]
+        else:
+            result[name] = np.concatenate([data[start:stop] for start, stop in ranges])
+
+    return result
+
+
+def decode_column(name: str, codes: np.ndarray, store_dir: Path = STORE_DIR) -> list:
+    """Decode int32 dictionary codes back to strings (None for missing)."""
+    values = read_dictionary(name, store_dir)
+    return [values[code] if code != MISSING_CODE else None for code in codes]
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def print_info(store_dir: Path = STORE_DIR):
+    manifest = read_manifest(store_dir)
+    days = sorted(manifest["days"])
+    print(f"Store: {store_dir}")
+    print(f"Rows: {manifest['rows']}")
+    if days:
+        print(f"Days: {len(days)} ({days[0]} .. {days[-1]})")
+    else:
+        print("Days: 0")
+    for name in DICT_COLUMNS:
+        print(f"  {name}: {len(read_dictionary(name, store_dir))} distinct values")
+
+
+def main():
+    """Main entry point."""
+    command = sys.argv[1] if len(sys.argv) > 1 else "compact"
+
+    if command == "compact":
+        print("Compacting closed-day traces...")
+        compacted = compact_closed_days()
+        print(f"Compacted {len(compacted)} day(s)")
+    elif command == "info":
+        print_info()
+    else:
+        print("Usage: python event_store.py [compact|info]", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CREAACTIVO LOGISTICS INTELLIGENCE SYSTEM
+Text Normalization
+
+Text normalization shared by the analytics scripts (build_graph.py,
+event_store.py): names, so "TYC", "Tyc" and "T&C" resolve to the same
+entity, and amounts, so "S/.150" reads the same in both.
+"""
+
+import re
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text: Title Case, remove accents for comparison,
+    but preserve readable format.
+    """
+    if not text:
+        return ""
+
+    # Strip and title case
+    normalized = text.strip().title()
+
+    # Common corrections
+    corrections = {
+        "Patricia": "Patricia",
+        "Angelica": "Angelica",
+        "Angélica": "Angelica",
+        "Tyc": "TYC",
+        "Tic": "TYC",
+        "T&C": "TYC",
+        "Dhl": "DHL",
+        "Hugo": "Hugo",
+        "Johana": "Johana",
+        "Viniles": "Viniles",
+        "Vinilas": "Viniles",
+        "Polos": "Polos",
+    }
+
+    for wrong, correct in corrections.items():
+        if normalized == wrong:
+            normalized = correct
+            break
+
+    return normalized
+
+
+def remove_accents(text: str) -> str:
+    """Remove accents for ID generation (keeps letters)."""
+    if not text:
+        return ""
+    nfkd = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in nfkd if not unicodedata.combining(c))
+
+
+def parse_monto(value: str):
+    """
+    Parse an amount like "S/.150", "S/ 1,250.50" or "150 soles".
+    Returns None when no number is present.
+    """
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", value)
+    if not match:
+        return None
+    try:
+        return float(match.group(0).replace(",", ""))
+    except ValueError:
+        return None
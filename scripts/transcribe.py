@@ -3,35 +3,116 @@
 Local Whisper transcription script using faster-whisper with CUDA.
 Called from Node.js via child process.
 
-Usage: python transcribe.py <audio_file_path>
-Output: Transcribed text to stdout
+Usage:
+    python transcribe.py <audio_file_path>   Transcribe (text to stdout)
+    python transcribe.py --prepare           Convert model to local int8 snapshot
+    python transcribe.py --serve             Long-lived worker (JSON lines)
+
+In --serve mode the model is loaded once, warmed up with a synthetic
+decode, then requests are read from stdin and answered on stdout, one
+JSON object per line:
+    -> {"ready": true}
+    <- {"id": 1, "path": "audio.ogg"}
+    -> {"id": 1, "text": "..."}  or  {"id": 1, "error": "..."}
+
+The model is loaded from a pre-converted CTranslate2 int8 snapshot in
+models/whisper-medium-ct2-int8 when it exists, so startup never touches
+the HuggingFace Hub and works fully offline. Timings go to stderr.
 """
 
 import sys
 import os
+import json
+import time
+from pathlib import Path
 
 # Force UTF-8 encoding for stdout
 sys.stdout.reconfigure(encoding='utf-8')
+sys.stdin.reconfigure(encoding='utf-8')
 
 # Suppress warnings
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
+# Get project root (parent of scripts directory)
+PROJECT_ROOT = Path(__file__).parent.parent
+MODEL_NAME = "medium"
+SOURCE_MODEL = "openai/whisper-medium"
+MODEL_DIR = PROJECT_ROOT / "models" / "whisper-medium-ct2-int8"
+
+# Files faster-whisper needs next to model.bin
+SNAPSHOT_EXTRA_FILES = ["tokenizer.json", "preprocessor_config.json"]
+
+# Local snapshot present: never hit the network (no Hub cache lookups)
+if (MODEL_DIR / "model.bin").exists():
+    os.environ['HF_HUB_OFFLINE'] = '1'
+
 from faster_whisper import WhisperModel
 
 # Load model once (cached after first load)
 MODEL = None
 
+
+def log_timing(label: str, seconds: float):
+    """Report a timing to stderr (stdout is reserved for the transcription)."""
+    print(f"[Whisper] {label}: {seconds * 1000:.0f} ms", file=sys.stderr)
+
+
 def get_model():
     global MODEL
     if MODEL is None:
+        start = time.perf_counter()
         # Using CPU since cuDNN is not installed (still fast with medium model)
-        MODEL = WhisperModel("medium", device="cpu", compute_type="int8")
+        if (MODEL_DIR / "model.bin").exists():
+            MODEL = WhisperModel(
+                str(MODEL_DIR),
+                device="cpu",
+                compute_type="int8",
+                local_files_only=True,
+            )
+        else:
+            print(
+                f"[Whisper] Local snapshot not found ({MODEL_DIR}), "
+                f"resolving '{MODEL_NAME}' by name. Run with --prepare.",
+                file=sys.stderr,
+            )
+            MODEL = WhisperModel(MODEL_NAME, device="cpu", compute_type="int8")
+        log_timing("load", time.perf_counter() - start)
     return MODEL
 
+
+def prepare_model() -> Path:
+    """
+    Convert the Whisper model to a CTranslate2 int8 snapshot in MODEL_DIR.
+    Needs network access and transformers/torch once; afterwards the bot
+    loads the snapshot offline.
+    """
+    from ctranslate2.converters import TransformersConverter
+
+    MODEL_DIR.parent.mkdir(parents=True, exist_ok=True)
+    converter = TransformersConverter(SOURCE_MODEL, copy_files=SNAPSHOT_EXTRA_FILES)
+    converter.convert(str(MODEL_DIR), quantization="int8", force=True)
+    return MODEL_DIR
+
+
+def warmup():
+    """Load the model and run a synthetic decode to pay first-inference costs."""
+    import numpy as np
+
+    model = get_model()
+
+    start = time.perf_counter()
+    # One second of silence at 16 kHz; VAD off so the decoder actually runs
+    silence = np.zeros(16000, dtype=np.float32)
+    segments, _ = model.transcribe(silence, language="es", beam_size=1, vad_filter=False)
+    list(segments)  # segments is a lazy generator
+    log_timing("warmup decode", time.perf_counter() - start)
+
+
 def transcribe(audio_path: str) -> str:
     """Transcribe audio file and return text."""
     model = get_model()
 
+    start = time.perf_counter()
     segments, info = model.transcribe(
         audio_path,
         language="es",
@@ -41,13 +122,58 @@ def transcribe(audio_path: str) -> str:
 
     # Combine all segments
     text = " ".join(segment.text.strip() for segment in segments)
+    log_timing("decode", time.perf_counter() - start)
     return text
 
+
+def send(message: dict):
+    """Write one JSON line to stdout for the Node.js side."""
+    print(json.dumps(message, ensure_ascii=False), flush=True)
+
+
+def serve():
+    """Load + warm up the model once, then transcribe requests from stdin."""
+    warmup()
+    send({"ready": True})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            audio_path = request["path"]
+            if not os.path.exists(audio_path):
+                raise FileNotFoundError(f"File not found: {audio_path}")
+            send({"id": request_id, "text": transcribe(audio_path)})
+        except Exception as e:
+            send({"id": request_id, "error": str(e)})
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python transcribe.py <audio_file_path>", file=sys.stderr)
+        print("Usage: python transcribe.py <audio_file_path> | --prepare | --serve", file=sys.stderr)
         sys.exit(1)
 
+    if sys.argv[1] == "--prepare":
+        try:
+            path = prepare_model()
+            print(f"Model snapshot saved to: {path}")
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
+
+    if sys.argv[1] == "--serve":
+        try:
+            serve()
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
+
     audio_path = sys.argv[1]
 
     if not os.path.exists(audio_path):
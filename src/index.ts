@@ -9,6 +9,7 @@ import { initializeStorage } from './services/storage';
 import { getResumenDia } from './services/daily-storage';
 import { initializeWhatsApp, sendEndOfDayReminder, client } from './whatsapp/client';
 import { initializeDrive, syncAllToDrive, isDriveAvailable } from './services/drive';
+import { startTranscriptionWorker, stopTranscriptionWorker } from './services/transcription';
 
 const BANNER = `
 ╔═══════════════════════════════════════════════════════════════╗
@@ -55,6 +56,11 @@ async function main() {
       console.log('[Init] Google Drive not configured (running in local-only mode)\n');
     }
 
+    // Start Whisper worker in the background (loads model once + warm-up decode).
+    // Voice notes arriving before it's ready wait for it.
+    console.log('[Init] Starting Whisper worker in background...');
+    startTranscriptionWorker();
+
     // Initialize WhatsApp
     console.log('[Init] Starting WhatsApp client...');
     await initializeWhatsApp();
@@ -121,6 +127,9 @@ process.on('SIGINT', async () => {
     console.log('[Shutdown] Closing WhatsApp client...');
     await client.destroy();
 
+    // Stop Whisper worker
+    stopTranscriptionWorker();
+
     console.log('[Shutdown] Goodbye!\n');
     process.exit(0);
 
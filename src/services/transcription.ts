@@ -3,11 +3,13 @@
 // Local Whisper Transcription Service (faster-whisper + CUDA)
 // ============================================
 
-import { spawn } from 'child_process';
+import { spawn, type ChildProcessWithoutNullStreams } from 'child_process';
 import fs from 'fs';
 import path from 'path';
 
 const SCRIPT_PATH = path.join(process.cwd(), 'scripts', 'transcribe.py');
+// Ruta absoluta de Python (Anaconda) donde está instalado faster-whisper
+const PYTHON_PATH = 'D:/Anaconda/python.exe';
 
 /**
  * Transcribe audio using local faster-whisper with CUDA
@@ -74,42 +76,151 @@ export function aplicarCorrecciones(texto: string): string {
   return resultado;
 }
 
-export async function transcribeAudioFile(filePath: string): Promise<string> {
-  return new Promise((resolve, reject) => {
-    console.log('[Transcription] Starting local Whisper transcription...');
+// =============================================================================
+// WHISPER WORKER (long-lived Python process, model loaded once)
+// =============================================================================
+
+interface PendingRequest {
+  resolve: (text: string) => void;
+  reject: (error: Error) => void;
+}
 
-    // Usar ruta absoluta de Python (Anaconda) donde está instalado faster-whisper
-    const python = spawn('D:/Anaconda/python.exe', [SCRIPT_PATH, filePath]);
+let worker: ChildProcessWithoutNullStreams | null = null;
+let workerReady: Promise<void> | null = null;
+let nextRequestId = 1;
+const pending = new Map<number, PendingRequest>();
 
-    let stdout = '';
-    let stderr = '';
+/**
+ * Call `onLine` for every complete line of a stream
+ */
+function onLines(stream: NodeJS.ReadableStream, onLine: (line: string) => void): void {
+  let buffer = '';
+  stream.on('data', (data) => {
+    buffer += data.toString();
+    let newline: number;
+    while ((newline = buffer.indexOf('\n')) !== -1) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) onLine(line);
+    }
+  });
+}
+
+/**
+ * Start the Whisper worker: it loads the model once, runs a synthetic
+ * warm-up decode and then serves every transcription of this bot session.
+ * Safe to call repeatedly; returns the same ready promise while running.
+ */
+export function startTranscriptionWorker(): Promise<void> {
+  if (workerReady) return workerReady;
 
-    python.stdout.on('data', (data) => {
-      stdout += data.toString();
+  console.log('[Transcription] Starting Whisper worker...');
+  const python = spawn(PYTHON_PATH, [SCRIPT_PATH, '--serve']);
+  worker = python;
+
+  const ready = new Promise<void>((resolve, reject) => {
+    onLines(python.stdout, (line) => {
+      let message: { ready?: boolean; id?: number; text?: string; error?: string };
+      try {
+        message = JSON.parse(line);
+      } catch {
+        console.warn('[Transcription] Unexpected worker output:', line);
+        return;
+      }
+
+      if (message.ready) {
+        console.log('[Transcription] Whisper worker ready');
+        resolve();
+        return;
+      }
+
+      const request = message.id !== undefined ? pending.get(message.id) : undefined;
+      if (!request) return;
+      pending.delete(message.id!);
+
+      if (message.error !== undefined) {
+        request.reject(new Error(`Transcription failed: ${message.error}`));
+      } else {
+        request.resolve(message.text ?? '');
+      }
     });
 
-    python.stderr.on('data', (data) => {
-      stderr += data.toString();
+    // Load/decode timings and errors from the worker
+    onLines(python.stderr, (line) => {
+      if (line.startsWith('[Whisper]')) {
+        console.log(`[Transcription] ${line.replace('[Whisper] ', '')}`);
+      } else {
+        console.error('[Transcription] Worker:', line);
+      }
     });
 
     python.on('close', (code) => {
-      if (code === 0) {
-        const transcripcionRaw = stdout.trim();
-        const transcription = aplicarCorrecciones(transcripcionRaw);
-        console.log('[Transcription] Successfully transcribed audio');
-        if (transcripcionRaw !== transcription) {
-          console.log('[Transcription] Correcciones aplicadas');
-        }
-        resolve(transcription);
-      } else {
-        console.error('[Transcription] Error:', stderr);
-        reject(new Error(`Transcription failed: ${stderr}`));
+      console.error(`[Transcription] Whisper worker exited (code ${code})`);
+      const error = new Error(`Whisper worker exited (code ${code})`);
+      reject(error);
+      for (const request of pending.values()) {
+        request.reject(error);
+      }
+      pending.clear();
+      // Next transcription starts a fresh worker
+      if (worker === python) {
+        worker = null;
+        workerReady = null;
       }
     });
 
     python.on('error', (error) => {
       console.error('[Transcription] Process error:', error);
       reject(new Error(`Failed to start transcription process: ${error.message}`));
+      if (worker === python) {
+        worker = null;
+        workerReady = null;
+      }
+    });
+
+    // Writes to a worker that just died; 'close' rejects the pending requests
+    python.stdin.on('error', (error) => {
+      console.error('[Transcription] Worker stdin error:', error.message);
     });
   });
+
+  // Avoid unhandled rejection when nobody awaits the startup promise
+  ready.catch(() => {});
+
+  workerReady = ready;
+  return ready;
+}
+
+/**
+ * Stop the Whisper worker (on shutdown)
+ */
+export function stopTranscriptionWorker(): void {
+  if (worker) {
+    worker.stdin.end();
+    worker.kill();
+  }
+}
+
+export async function transcribeAudioFile(filePath: string): Promise<string> {
+  console.log('[Transcription] Starting local Whisper transcription...');
+
+  // Waits for a warm-up still in progress instead of loading a second model
+  await startTranscriptionWorker();
+  const python = worker;
+  if (!python) {
+    throw new Error('Transcription failed: Whisper worker not running');
+  }
+
+  const transcripcionRaw = await new Promise<string>((resolve, reject) => {
+    const id = nextRequestId++;
+    pending.set(id, { resolve, reject });
+    python.stdin.write(JSON.stringify({ id, path: path.resolve(filePath) }) + '\n');
+  });
+
+  const transcription = aplicarCorrecciones(transcripcionRaw.trim());
+  console.log('[Transcription] Successfully transcribed audio');
+  if (transcripcionRaw.trim() !== transcription) {
+    console.log('[Transcription] Correcciones aplicadas');
+  }
+  return transcription;
 }